@@ -1,6 +1,7 @@
 """FastAPI Backend for Givaudan RAG System"""
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from contextlib import asynccontextmanager
@@ -8,6 +9,7 @@ import time
 from datetime import datetime
 
 from src.react_agent import ReActAgent
+from src.config import CACHE_SIMILARITY_THRESHOLD
 from src.utils import logger
 
 class ChatMessage(BaseModel):
@@ -34,11 +36,9 @@ class SystemInfo(BaseModel):
     quality: str
     features: List[str]
 
-react_agent = None
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global react_agent
+    app.state.react_agent = None
 
     # Startup
     logger.info(" Initializing Givaudan RAG API...")
@@ -46,6 +46,7 @@ async def lifespan(app: FastAPI):
         logger.info("Loading ReAct Agent (Weaviate + Hybrid Search)...")
         react_agent = ReActAgent()
         react_agent.setup_rag()
+        app.state.react_agent = react_agent
         logger.info(" ReAct Agent ready!")
     except Exception as e:
         logger.error(f" Initialization error: {e}")
@@ -53,14 +54,22 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # Shutdown (cleanup if needed)
+    # Shutdown: write queued cache entries
     logger.info("Shutting down...")
+    await app.state.react_agent.cache.flush_writes()
+
+def get_agent(request: Request) -> ReActAgent:
+    agent = getattr(request.app.state, "react_agent", None)
+    if agent is None:
+        raise HTTPException(status_code=503, detail="ReAct Agent not initialized")
+    return agent
 
 app = FastAPI(
     title="Givaudan RAG API",
     description="RAG system with Weaviate, Hybrid Search, and ReAct Agent",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Rust JSON encoder, faster than stdlib json
 )
 
 # CORS configuration
@@ -82,11 +91,12 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
+    ready = getattr(request.app.state, "react_agent", None) is not None
     return {
-        "status": "healthy" if react_agent is not None else "unavailable",
-        "timestamp": datetime.now().isoformat(),
-        "react_agent_ready": react_agent is not None
+        "status": "healthy" if ready else "unavailable",
+        "timestamp": datetime.now(),
+        "react_agent_ready": ready
     }
 
 @app.get("/system", response_model=SystemInfo)
@@ -102,25 +112,20 @@ async def get_system_info():
             "Hybrid Search (BM25 30% + Dense 70%)",
             "Cross-encoder reranking (ms-marco-MiniLM)",
             "ReAct pattern with 2 tools (VectorDB, Web)",
-            "Semantic caching (0.88 threshold)",
+            f"Semantic caching ({CACHE_SIMILARITY_THRESHOLD} threshold)",
             "Conversation memory (last 6 messages)",
             "Web search fallback (SerpAPI)"
         ]
     )
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, react_agent: ReActAgent = Depends(get_agent)):
     start_time = time.time()
 
     try:
-        if not react_agent:
-            raise HTTPException(status_code=503, detail="ReAct Agent not initialized")
-
-        # Convert chat history
-        chat_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in request.chat_history
-        ] if request.chat_history else []
+        # Plain dicts for the agent; the Pydantic messages are reused in the response
+        history = request.chat_history or []
+        chat_history = [msg.model_dump(include={"role", "content"}) for msg in history]
 
         # Use async version with caching support (pass chat_history!)
         result = await react_agent.ask_async(
@@ -140,18 +145,16 @@ async def chat(request: ChatRequest):
         processing_time = time.time() - start_time
 
         # Add to chat history
-        updated_history = chat_history + [
-            {"role": "user", "content": request.question, "timestamp": datetime.now().isoformat()},
-            {"role": "assistant", "content": answer, "timestamp": datetime.now().isoformat()}
+        timestamp = datetime.now().isoformat()
+        updated_history = history + [
+            ChatMessage(role="user", content=request.question, timestamp=timestamp),
+            ChatMessage(role="assistant", content=answer, timestamp=timestamp)
         ]
 
         return ChatResponse(
             answer=answer,
             metadata=metadata,
-            chat_history=[
-                ChatMessage(role=msg["role"], content=msg["content"], timestamp=msg.get("timestamp"))
-                for msg in updated_history
-            ],
+            chat_history=updated_history,
             processing_time=processing_time
         )
 
@@ -162,11 +165,15 @@ async def chat(request: ChatRequest):
 
 if __name__ == "__main__":
     import uvicorn
+    from src.config import API_WORKERS
 
+    # Production settings: no file watcher, API_WORKERS processes, uvloop + httptools
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        workers=API_WORKERS,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -1,56 +1,87 @@
 """Corpus analysis script - generates stats and keywords for documents"""
 import sys
+import os
 from pathlib import Path
 import csv
-import tiktoken
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import re
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.document_loader import MultiFormatDocumentLoader
 from src.config import RAW_DATA_DIR, OUTPUTS_DIR
-from src.utils import logger
+from src.utils import logger, _get_encoder
 
+# Compiled once at import instead of per document
+_WORD_RE = re.compile(r'\b[a-zàâäéèêëïîôùûüÿœæç]+\b')
 
-def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
-    """Count tokens using tiktoken"""
+_STOP_WORDS = frozenset({
+    'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'ou', 'mais',
+    'dans', 'pour', 'par', 'sur', 'avec', 'sans', 'est', 'sont', 'à',
+    'au', 'aux', 'ce', 'ces', 'cette', 'cet', 'son', 'sa', 'ses',
+    'leur', 'leurs', 'qui', 'que', 'dont', 'où', 'si', 'plus', 'peut',
+    'être', 'avoir', 'faire', 'tout', 'tous', 'toute', 'toutes'
+})
+
+CSV_FIELDS = [
+    'document_num', 'filename', 'format', 'num_pages', 'char_count',
+    'token_count', 'language', 'keyword_1', 'keyword_2', 'keyword_3'
+]
+
+# Below this many documents, process start-up costs more than it saves
+PARALLEL_MIN_DOCUMENTS = 64
+
+_FRENCH_INDICATORS = frozenset(['le', 'la', 'les', 'un', 'une', 'des', 'et', 'est', 'dans', 'pour'])
+_ENGLISH_INDICATORS = frozenset(['the', 'a', 'an', 'and', 'is', 'in', 'for', 'of', 'to'])
+
+
+def count_tokens_batch(texts: list) -> list:
+    """Count tokens for all texts in a single multi-threaded tiktoken call"""
     try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
-    except:
-        return len(text.split()) * 1.3
+        # Resolved here, not at import: without network the BPE download fails
+        # and the approximate count below is used instead
+        encoded = _get_encoder("gpt-4o-mini").encode_batch(texts, num_threads=os.cpu_count() or 1)
+        return [len(tokens) for tokens in encoded]
+    except Exception:
+        return [int(len(text.split()) * 1.3) for text in texts]
 
 
-def extract_keywords(text: str, n: int = 3) -> list:
+def tokenize(text: str) -> list:
+    """Lowercase and split text into words (single pass shared by all analyses)"""
+    return _WORD_RE.findall(text.lower())
+
+
+def extract_keywords(words: list, n: int = 3) -> list:
     """Simple keyword extraction - most frequent meaningful words"""
-    words = re.findall(r'\b[a-zàâäéèêëïîôùûüÿœæç]+\b', text.lower())
-
-    stop_words = {
-        'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'ou', 'mais',
-        'dans', 'pour', 'par', 'sur', 'avec', 'sans', 'est', 'sont', 'à',
-        'au', 'aux', 'ce', 'ces', 'cette', 'cet', 'son', 'sa', 'ses',
-        'leur', 'leurs', 'qui', 'que', 'dont', 'où', 'si', 'plus', 'peut',
-        'être', 'avoir', 'faire', 'tout', 'tous', 'toute', 'toutes'
-    }
-
-    meaningful_words = [w for w in words if w not in stop_words and len(w) > 3]
-    word_counts = Counter(meaningful_words)
+    word_counts = Counter(w for w in words if w not in _STOP_WORDS and len(w) > 3)
     return [word for word, _ in word_counts.most_common(n)]
 
 
-def detect_language(text: str) -> str:
+def detect_language(words: list) -> str:
     """Simple language detection based on common words"""
-    french_indicators = ['le', 'la', 'les', 'un', 'une', 'des', 'et', 'est', 'dans', 'pour']
-    english_indicators = ['the', 'a', 'an', 'and', 'is', 'in', 'for', 'of', 'to']
-
-    text_lower = text.lower()
-    french_count = sum(1 for word in french_indicators if f' {word} ' in text_lower)
-    english_count = sum(1 for word in english_indicators if f' {word} ' in text_lower)
+    vocabulary = set(words)
+    french_count = len(_FRENCH_INDICATORS & vocabulary)
+    english_count = len(_ENGLISH_INDICATORS & vocabulary)
 
     return "Français" if french_count > english_count else "English"
 
 
+def analyze_text(content: str) -> tuple:
+    """Language and keywords for one document (top-level so it pickles to workers)"""
+    words = tokenize(content)
+    return detect_language(words), extract_keywords(words, n=3)
+
+
+def analyze_texts(contents: list) -> list:
+    """Run analyze_text over all documents, fanning out to processes on large corpora"""
+    if len(contents) < PARALLEL_MIN_DOCUMENTS:
+        return [analyze_text(content) for content in contents]
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(analyze_text, contents, chunksize=4))
+
+
 def analyze_corpus():
     """Main corpus analysis function"""
     logger.info("Starting corpus analysis...")
@@ -59,65 +90,57 @@ def analyze_corpus():
     documents = loader.load_directory(RAW_DATA_DIR, recursive=False)
     logger.info(f"Loaded {len(documents)} documents")
 
-    analysis_results = []
+    contents = [doc.page_content for doc in documents]
+    token_counts = count_tokens_batch(contents)
+    text_analyses = analyze_texts(contents)
+
     total_tokens = 0
+    lang_counts = Counter()
+    format_counts = Counter()
 
-    for i, doc in enumerate(documents, 1):
-        filename = doc.metadata.get('filename', f'doc_{i}')
-        format_type = doc.metadata.get('format', 'unknown')
-        num_pages = doc.metadata.get('num_pages', 1)
-        content = doc.page_content
-
-        char_count = len(content)
-        token_count = count_tokens(content)
-        language = detect_language(content)
-        keywords = extract_keywords(content, n=3)
-
-        total_tokens += token_count
-
-        analysis_results.append({
-            'document_num': i,
-            'filename': filename,
-            'format': format_type,
-            'num_pages': num_pages,
-            'char_count': char_count,
-            'token_count': token_count,
-            'language': language,
-            'keyword_1': keywords[0] if len(keywords) > 0 else '',
-            'keyword_2': keywords[1] if len(keywords) > 1 else '',
-            'keyword_3': keywords[2] if len(keywords) > 2 else ''
-        })
-
-        logger.info(f"{i}. {filename}: {token_count} tokens")
-
-    # Save CSV
+    # Stream one row per document; only running totals stay in memory
     csv_path = OUTPUTS_DIR / "corpus_analysis.csv"
     with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=analysis_results[0].keys())
-        writer.writeheader()
-        writer.writerows(analysis_results)
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+
+        for i, (doc, token_count, (language, keywords)) in enumerate(
+                zip(documents, token_counts, text_analyses), 1):
+            filename = doc.metadata.get('filename', f'doc_{i}')
+            format_type = doc.metadata.get('format', 'unknown')
+            num_pages = doc.metadata.get('num_pages', 1)
+
+            char_count = len(doc.page_content)
+            keywords = keywords + [''] * (3 - len(keywords))
+
+            total_tokens += token_count
+            lang_counts[language] += 1
+            format_counts[format_type] += 1
+
+            writer.writerow([
+                i, filename, format_type, num_pages, char_count,
+                token_count, language, *keywords
+            ])
+
+            logger.info(f"{i}. {filename}: {token_count} tokens")
 
     logger.info(f"Saved: {csv_path}")
 
-    # Generate report
+    # Generate report (per-document section is read back from the CSV)
     report_path = OUTPUTS_DIR / "corpus_analysis_report.txt"
-    with open(report_path, 'w', encoding='utf-8') as f:
+    with open(report_path, 'w', encoding='utf-8') as f, \
+            open(csv_path, newline='', encoding='utf-8') as rows:
         f.write("Corpus Analysis Report\n\n")
         f.write(f"Total documents: {len(documents)}\n")
         f.write(f"Total tokens: {total_tokens:,}\n")
         f.write(f"Average tokens per doc: {total_tokens // len(documents):,}\n\n")
 
-        languages = [r['language'] for r in analysis_results]
-        lang_counts = Counter(languages)
         f.write(f"Languages: {dict(lang_counts)}\n")
-
-        formats = [r['format'] for r in analysis_results]
-        format_counts = Counter(formats)
         f.write(f"Formats: {dict(format_counts)}\n\n")
 
-        for result in analysis_results:
+        for result in csv.DictReader(rows):
             f.write(f"{result['document_num']}. {result['filename']}\n")
-            f.write(f"  {result['token_count']:,} tokens, {result['language']}\n")
+            f.write(f"  {int(result['token_count']):,} tokens, {result['language']}\n")
             f.write(f"  Keywords: {result['keyword_1']}, {result['keyword_2']}, {result['keyword_3']}\n\n")
 
     logger.info(f"Saved: {report_path}")
@@ -2,8 +2,10 @@
 import sys
 from pathlib import Path
 import csv
+import json
+import hashlib
 import asyncio
-from typing import Dict
+from typing import Dict, List, Optional
 from langchain_openai import ChatOpenAI
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -28,57 +30,103 @@ QUESTIONS = [
     "Comment Givaudan assure-t-elle la durabilité de ses ingrédients ?",
 ]
 
+# Cap in-flight requests to stay under OpenAI rate limits (429)
+MAX_CONCURRENT_QUESTIONS = 4
+BASELINE_MAX_CONCURRENCY = 8
 
-def test_baseline_llm(question: str) -> str:
-    """Test baseline LLM without RAG"""
-    llm = ChatOpenAI(
-        model=LLM_MODEL,
-        temperature=0,
-        api_key=OPENAI_API_KEY
-    )
+# Baseline answers are deterministic (temperature=0), so they are memoized on disk
+BASELINE_CACHE_PATH = OUTPUTS_DIR / "baseline_cache.json"
+
+# Shared client: one HTTP connection pool for every baseline request
+_BASELINE_LLM = ChatOpenAI(
+    model=LLM_MODEL,
+    temperature=0,
+    api_key=OPENAI_API_KEY
+)
 
+
+async def baseline_batch(questions: List[str]) -> List[str]:
+    """Test baseline LLM without RAG, all questions in one async batch"""
     messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": question}
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": question}
+        ]
+        for question in questions
     ]
 
-    response = llm.invoke(messages)
-    return response.content
+    responses = await _BASELINE_LLM.abatch(
+        messages,
+        config={"max_concurrency": BASELINE_MAX_CONCURRENCY}
+    )
+    return [response.content for response in responses]
+
+
+def baseline_cache_key(question: str) -> str:
+    """Cache key covering everything that determines the baseline answer"""
+    return hashlib.sha256(f"{LLM_MODEL}\n{SYSTEM_PROMPT}\n{question}".encode('utf-8')).hexdigest()
+
+
+async def cached_baseline_batch(questions: List[str]) -> List[str]:
+    """Baseline answers, only calling the LLM for questions not cached on disk"""
+    cache = {}
+    if BASELINE_CACHE_PATH.exists():
+        with open(BASELINE_CACHE_PATH, encoding='utf-8') as f:
+            cache = json.load(f)
 
+    keys = [baseline_cache_key(question) for question in questions]
+    missing = [question for question, key in zip(questions, keys) if key not in cache]
+    logger.info(f"Baseline cache: {len(questions) - len(missing)} hit(s), {len(missing)} miss(es)")
 
-async def test_rag_system(question: str, agent: ReActAgent) -> Dict:
+    if missing:
+        answers = await baseline_batch(missing)
+        cache.update(zip(map(baseline_cache_key, missing), answers))
+        with open(BASELINE_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+
+    return [cache[key] for key in keys]
+
+
+async def test_rag_system(question: str, agent: ReActAgent, semaphore: asyncio.Semaphore) -> Dict:
     """Test RAG system with full pipeline"""
-    result = await agent.ask_async(question=question, chat_history=[])
+    async with semaphore:
+        result = await agent.ask_async(question=question, chat_history=[])
+
+    logger.info(f"Answered: {question}")
+    logger.info(f"Cache: {'HIT' if result.get('cache_hit', False) else 'MISS'}, "
+                f"Time: {result.get('processing_time', 0):.2f}s")
     return result
 
 
-async def generate_answers():
+async def generate_answers(agent: Optional[ReActAgent] = None):
     """Main function to generate all answers"""
     logger.info("Starting RAG answers generation...")
 
-    agent = ReActAgent()
+    if agent is None:
+        agent = ReActAgent()
     agent.setup_rag()
 
-    results = []
-
-    for i, question in enumerate(QUESTIONS, 1):
-        logger.info(f"\nQuestion {i}/{len(QUESTIONS)}: {question}")
+    logger.info(f"Dispatching {len(QUESTIONS)} questions (max {MAX_CONCURRENT_QUESTIONS} concurrent)")
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUESTIONS)
 
-        baseline_answer = test_baseline_llm(question)
-        rag_result = await test_rag_system(question, agent)
-        rag_answer = rag_result['answer']
-        cache_hit = rag_result.get('cache_hit', False)
-        processing_time = rag_result.get('processing_time', 0)
+    # Baseline batch and RAG calls overlap; gather preserves QUESTIONS order
+    baseline_answers, rag_results = await asyncio.gather(
+        cached_baseline_batch(QUESTIONS),
+        asyncio.gather(*(test_rag_system(question, agent, semaphore) for question in QUESTIONS))
+    )
 
-        logger.info(f"Cache: {'HIT' if cache_hit else 'MISS'}, Time: {processing_time:.2f}s")
+    # Persist queued cache writes before asyncio.run() tears the loop down
+    await agent.cache.flush_writes()
 
+    results = []
+    for question, baseline_answer, rag_result in zip(QUESTIONS, baseline_answers, rag_results):
         results.append({
             'question': question,
             'llm_answer_baseline': baseline_answer,
-            'rag_answer': rag_answer,
+            'rag_answer': rag_result['answer'],
             'sources': 'Givaudan corpus (see data/raw/)',
-            'cache_hit': cache_hit,
-            'processing_time_seconds': round(processing_time, 2)
+            'cache_hit': rag_result.get('cache_hit', False),
+            'processing_time_seconds': round(rag_result.get('processing_time', 0), 2)
         })
 
     csv_path = OUTPUTS_DIR / "rag_answers.csv"
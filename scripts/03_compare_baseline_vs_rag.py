@@ -1,11 +1,12 @@
 """Baseline vs RAG comparison report generator"""
-import sys
+import logging
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Static report: resolve paths locally instead of importing the src package
+OUTPUTS_DIR = Path(__file__).parent.parent / "outputs"
 
-from src.config import OUTPUTS_DIR
-from src.utils import logger
+# Same logger name as src.utils.RAGLogger, so run_all output stays uniform
+logger = logging.getLogger("RAG_Givaudan")
 
 
 def generate_comparison():
@@ -42,4 +43,5 @@ Key Differences:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     generate_comparison()
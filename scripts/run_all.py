@@ -1,42 +1,85 @@
-"""Run all output generation scripts in sequence"""
+"""Run all output generation scripts in parallel"""
 import sys
 from pathlib import Path
-import subprocess
+import asyncio
+import hashlib
+import importlib
 import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.config import RAW_DATA_DIR, OUTPUTS_DIR
 from src.utils import logger
 
+CORPUS_FINGERPRINT_PATH = OUTPUTS_DIR / ".corpus_analysis.fingerprint"
 
-def run_script(script_path: Path, description: str):
-    """Run a Python script and handle errors"""
+
+def load_step(module_name: str, func_name: str) -> Callable:
+    """Import a script module in-process (names start with digits, hence importlib)"""
+    module = importlib.import_module(f"scripts.{module_name}")
+    return getattr(module, func_name)
+
+
+def corpus_fingerprint() -> str:
+    """Hash of name, mtime and size of every raw file plus the analysis script itself"""
+    h = hashlib.sha256()
+    paths = sorted(p for p in RAW_DATA_DIR.iterdir() if p.is_file())
+    for path in paths + [Path(__file__).parent / "01_analyze_corpus.py"]:
+        stat = path.stat()
+        h.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def run_corpus_analysis():
+    """Corpus analysis, skipped when data/raw/ is unchanged since the last run"""
+    fingerprint = corpus_fingerprint()
+    if ((OUTPUTS_DIR / "corpus_analysis.csv").exists()
+            and CORPUS_FINGERPRINT_PATH.exists()
+            and CORPUS_FINGERPRINT_PATH.read_text() == fingerprint):
+        logger.info("Corpus unchanged since last analysis, skipping")
+        return
+
+    load_step("01_analyze_corpus", "analyze_corpus")()
+    CORPUS_FINGERPRINT_PATH.write_text(fingerprint)
+
+
+def run_rag_answers():
+    asyncio.run(load_step("02_generate_rag_answers", "generate_answers")())
+
+
+def run_comparison():
+    load_step("03_compare_baseline_vs_rag", "generate_comparison")()
+
+
+# The three outputs do not read each other's files, so no step waits on another.
+# Entries are top-level functions so they can be pickled to worker processes.
+STEPS = [
+    (run_corpus_analysis, "Corpus Analysis"),
+    (run_rag_answers, "RAG Answers"),
+    (run_comparison, "Comparison Report"),
+]
+
+
+def run_step(step: Callable[[], None], description: str):
+    """Run a pipeline step and handle errors"""
     logger.info(f"\nRunning: {description}")
     start_time = time.time()
 
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+        step()
+        # Flush print() output (stdout) before the next log line (stderr)
+        sys.stdout.flush()
 
         elapsed = time.time() - start_time
         logger.info(f"Completed in {elapsed:.2f}s")
         return True
 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed: {description}")
-        if e.stdout:
-            print("STDOUT:", e.stdout)
-        if e.stderr:
-            print("STDERR:", e.stderr)
+    except Exception as e:
+        # Steps run in worker processes: log the full traceback, not just the message
+        logger.error(f"Failed: {description}: {e}\n{traceback.format_exc()}")
         return False
 
 
@@ -44,25 +87,17 @@ def main():
     """Run all generation scripts"""
     logger.info("Running all scripts...")
 
-    scripts_dir = Path(__file__).parent
-    scripts = [
-        (scripts_dir / "01_analyze_corpus.py", "Corpus Analysis"),
-        (scripts_dir / "02_generate_rag_answers.py", "RAG Answers"),
-        (scripts_dir / "03_compare_baseline_vs_rag.py", "Comparison Report"),
-    ]
-
-    results = []
     total_start = time.time()
 
-    for script_path, description in scripts:
-        if not script_path.exists():
-            logger.error(f"Script not found: {script_path}")
-            results.append((description, False))
-            continue
+    # Wall time becomes max(step) instead of sum(step)
+    with ProcessPoolExecutor(max_workers=len(STEPS)) as executor:
+        futures = {
+            executor.submit(run_step, step, description): description
+            for step, description in STEPS
+        }
+        outcomes = {futures[future]: future.result() for future in as_completed(futures)}
 
-        success = run_script(script_path, description)
-        results.append((description, success))
-        time.sleep(1)
+    results = [(description, outcomes[description]) for _, description in STEPS]
 
     total_elapsed = time.time() - total_start
 
@@ -0,0 +1,72 @@
+"""Semantic cache threshold tuning - F1 sweep over labeled query pairs"""
+import sys
+from pathlib import Path
+import argparse
+import csv
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import OPENAI_API_KEY, EMBEDDING_MODEL, CACHE_SIMILARITY_THRESHOLD
+from src.utils import logger
+
+
+def load_pairs(csv_path: Path) -> list:
+    """Load (q1, q2, is_duplicate) rows from a labeled CSV"""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return [
+            (row['q1'], row['q2'], row['is_duplicate'].strip() in ('1', 'true', 'True'))
+            for row in csv.DictReader(f)
+        ]
+
+
+def pair_similarities(pairs: list) -> np.ndarray:
+    """Cosine similarity of each pair, embedding every distinct query once"""
+    queries = sorted({q for q1, q2, _ in pairs for q in (q1, q2)})
+    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY)
+
+    vectors = np.array(embeddings.embed_documents(queries), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = {q: i for i, q in enumerate(queries)}
+
+    left = vectors[[index[q1] for q1, _, _ in pairs]]
+    right = vectors[[index[q2] for _, q2, _ in pairs]]
+    return np.einsum('ij,ij->i', left, right)
+
+
+def f1_at(similarities: np.ndarray, labels: np.ndarray, threshold: float) -> float:
+    """F1 score when pairs with similarity >= threshold count as cache hits"""
+    predicted = similarities >= threshold
+    tp = int(np.sum(predicted & labels))
+    fp = int(np.sum(predicted & ~labels))
+    fn = int(np.sum(~predicted & labels))
+    return 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+
+
+def tune_threshold(csv_path: Path, start: float = 0.30, stop: float = 0.95, step: float = 0.02) -> float:
+    """Sweep thresholds and return the one with the best F1"""
+    pairs = load_pairs(csv_path)
+    logger.info(f"Loaded {len(pairs)} labeled pairs from {csv_path}")
+
+    similarities = pair_similarities(pairs)
+    labels = np.array([is_duplicate for _, _, is_duplicate in pairs])
+
+    best_threshold, best_f1 = CACHE_SIMILARITY_THRESHOLD, -1.0
+    for threshold in np.arange(start, stop + step / 2, step):
+        f1 = f1_at(similarities, labels, threshold)
+        logger.info(f"  tau={threshold:.2f}  F1={f1:.3f}")
+        if f1 > best_f1:
+            best_threshold, best_f1 = round(float(threshold), 2), f1
+
+    logger.info(f"Best threshold for {EMBEDDING_MODEL}: {best_threshold} (F1={best_f1:.3f}, "
+                f"current: {CACHE_SIMILARITY_THRESHOLD})")
+    logger.info(f"Set CACHE_SIMILARITY_THRESHOLD={best_threshold} in .env to apply it")
+    return best_threshold
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("csv_path", type=Path, help="CSV with columns q1,q2,is_duplicate")
+    args = parser.parse_args()
+    tune_threshold(args.csv_path)
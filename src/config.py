@@ -1,10 +1,16 @@
 """Configuration for Givaudan RAG System"""
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
-# Charger les variables d'environnement
-load_dotenv()
+# Charger les variables d'environnement (une seule fois par arbre de processus :
+# load_dotenv exporte les valeurs dans os.environ, hérité par les processus enfants)
+if not os.environ.get("_GIVAUDAN_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_GIVAUDAN_DOTENV_LOADED"] = "1"
 
 # Chemins de base
 BASE_DIR = Path(__file__).parent.parent
@@ -15,31 +21,114 @@ OUTPUTS_DIR = BASE_DIR / "outputs"
 LOG_FILE = OUTPUTS_DIR / "log.txt"
 CSV_FILE = OUTPUTS_DIR / "rag_answers.csv"
 
-# Configuration OpenAI
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
-# Configuration RAG
-CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
-CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
-TOP_K_RETRIEVAL = int(os.getenv("TOP_K_RETRIEVAL", "3"))
-
-# Configuration Web Search
-SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY", "")
-
-# Configuration Weaviate (Vector Database)
-WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8090")
-WEAVIATE_TOP_K_RETRIEVE = int(os.getenv("WEAVIATE_TOP_K_RETRIEVE", "10"))
-WEAVIATE_TOP_K_FINAL = int(os.getenv("WEAVIATE_TOP_K_FINAL", "3"))
-WEAVIATE_HYBRID_ALPHA = float(os.getenv("WEAVIATE_HYBRID_ALPHA", "0.7"))
-
-# Configuration Agent Performance
-AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "5"))
-AGENT_MAX_EXECUTION_TIME = int(os.getenv("AGENT_MAX_EXECUTION_TIME", "30"))
-
-# Configuration Logging
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment-driven settings, parsed once per process"""
+    # Configuration OpenAI
+    openai_api_key: Optional[str]
+    llm_model: str
+    embedding_model: str
+
+    # Configuration RAG
+    chunk_size: int
+    chunk_overlap: int
+    top_k_retrieval: int
+
+    # Configuration Web Search
+    serpapi_api_key: str
+
+    # Configuration Weaviate (Vector Database)
+    weaviate_url: str
+    weaviate_grpc_port: int  # v4 client queries over gRPC
+    weaviate_top_k_retrieve: int
+    weaviate_top_k_final: int
+    weaviate_hybrid_alpha: float
+
+    # Configuration Embeddings locales (BGE, index Weaviate)
+    # precision: fp32, fp16 (GPU) ou int8 (quantization dynamique CPU)
+    local_embedding_model: str
+    local_embedding_device: str
+    local_embedding_precision: str
+
+    # Configuration Reranker: torch ou onnx (int8 ONNX Runtime, extra sentence-transformers[onnx])
+    reranker_backend: str
+
+    # Configuration Semantic Cache (query-to-query cosine, tune per embedding model
+    # with scripts/tune_cache_threshold.py)
+    cache_similarity_threshold: float
+
+    # Configuration Agent Performance
+    agent_max_iterations: int
+    agent_max_execution_time: int
+
+    # Configuration API (uvicorn workers, one ReAct Agent and one copy of the models per worker)
+    api_workers: int
+
+    # Configuration Logging
+    log_level: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        llm_model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+        chunk_size=int(os.getenv("CHUNK_SIZE", "500")),
+        chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "50")),
+        top_k_retrieval=int(os.getenv("TOP_K_RETRIEVAL", "3")),
+        serpapi_api_key=os.getenv("SERPAPI_API_KEY", ""),
+        weaviate_url=os.getenv("WEAVIATE_URL", "http://localhost:8090"),
+        weaviate_grpc_port=int(os.getenv("WEAVIATE_GRPC_PORT", "50051")),
+        weaviate_top_k_retrieve=int(os.getenv("WEAVIATE_TOP_K_RETRIEVE", "10")),
+        weaviate_top_k_final=int(os.getenv("WEAVIATE_TOP_K_FINAL", "3")),
+        weaviate_hybrid_alpha=float(os.getenv("WEAVIATE_HYBRID_ALPHA", "0.7")),
+        local_embedding_model=os.getenv("LOCAL_EMBEDDING_MODEL", "BAAI/bge-large-en-v1.5"),
+        local_embedding_device=os.getenv("LOCAL_EMBEDDING_DEVICE", "cpu"),
+        local_embedding_precision=os.getenv("LOCAL_EMBEDDING_PRECISION", "fp32"),
+        reranker_backend=os.getenv("RERANKER_BACKEND", "torch"),
+        cache_similarity_threshold=float(os.getenv("CACHE_SIMILARITY_THRESHOLD", "0.88")),
+        agent_max_iterations=int(os.getenv("AGENT_MAX_ITERATIONS", "5")),
+        agent_max_execution_time=int(os.getenv("AGENT_MAX_EXECUTION_TIME", "30")),
+        api_workers=int(os.getenv("API_WORKERS", "1")),
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+    )
+
+
+settings = get_settings()
+
+# Module-level aliases (used throughout as `from src.config import ...`)
+OPENAI_API_KEY = settings.openai_api_key
+LLM_MODEL = settings.llm_model
+EMBEDDING_MODEL = settings.embedding_model
+
+CHUNK_SIZE = settings.chunk_size
+CHUNK_OVERLAP = settings.chunk_overlap
+TOP_K_RETRIEVAL = settings.top_k_retrieval
+
+SERPAPI_API_KEY = settings.serpapi_api_key
+
+WEAVIATE_URL = settings.weaviate_url
+WEAVIATE_GRPC_PORT = settings.weaviate_grpc_port
+WEAVIATE_TOP_K_RETRIEVE = settings.weaviate_top_k_retrieve
+WEAVIATE_TOP_K_FINAL = settings.weaviate_top_k_final
+WEAVIATE_HYBRID_ALPHA = settings.weaviate_hybrid_alpha
+
+LOCAL_EMBEDDING_MODEL = settings.local_embedding_model
+LOCAL_EMBEDDING_DEVICE = settings.local_embedding_device
+LOCAL_EMBEDDING_PRECISION = settings.local_embedding_precision
+
+RERANKER_BACKEND = settings.reranker_backend
+
+CACHE_SIMILARITY_THRESHOLD = settings.cache_similarity_threshold
+
+AGENT_MAX_ITERATIONS = settings.agent_max_iterations
+AGENT_MAX_EXECUTION_TIME = settings.agent_max_execution_time
+
+API_WORKERS = settings.api_workers
+
+LOG_LEVEL = settings.log_level
 
 # System Prompt pour le chatbot
 SYSTEM_PROMPT = """Tu es un assistant spécialisé en parfumerie et aromatique, expert de l'entreprise Givaudan.
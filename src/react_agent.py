@@ -6,14 +6,22 @@ from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from pydantic import Field, ConfigDict
 import asyncio
+import fcntl
 import time
 
 from src.config import *
-from src.weaviate_rag_pipeline import WeaviateRAGPipeline
+from src.weaviate_rag_pipeline import get_pipeline
 from src.web_agent import WebSearchAgent
 from src.semantic_cache import get_cache
 from src.utils import logger
 
+# Greetings, bare or followed by punctuation (exact match, precomputed once)
+_GREETING_SET = frozenset(
+    g + p
+    for g in ['bonjour', 'salut', 'hello', 'hi', 'merci', 'thanks', 'ok', 'super', 'hey']
+    for p in ['', '!', '.', '?']
+)
+
 
 class VectorSearchTool(BaseTool):
     name: str = "search_vector_database"
@@ -24,16 +32,11 @@ class VectorSearchTool(BaseTool):
     def _run(self, query: str) -> str:
         try:
             docs = self.rag_pipeline.retrieve_relevant_chunks(query, k=3)
-            if not docs:
-                return "Aucun document trouvé."
-
-            results = []
-            for i, doc in enumerate(docs, 1):
-                source = doc.metadata.get('filename', 'unknown')
-                content = doc.page_content[:300]
-                results.append(f"[Doc {i} - {source}]\n{content}...")
-
-            return "\n".join(results)
+            results = [
+                f"[Doc {i} - {doc.metadata.get('filename', 'unknown')}]\n{doc.page_content[:300]}..."
+                for i, doc in enumerate(docs or (), 1)
+            ]
+            return "\n".join(results) if results else "Aucun document trouvé."
         except Exception as e:
             return f"Erreur: {e}"
 
@@ -72,16 +75,27 @@ class ReActAgent:
 
     def setup_rag(self):
         if not self.rag_pipeline:
-            self.rag_pipeline = WeaviateRAGPipeline(
+            self.rag_pipeline = get_pipeline(
                 weaviate_url=WEAVIATE_URL,
+                grpc_port=WEAVIATE_GRPC_PORT,
                 top_k_retrieve=WEAVIATE_TOP_K_RETRIEVE,
                 top_k_final=WEAVIATE_TOP_K_FINAL,
-                hybrid_alpha=WEAVIATE_HYBRID_ALPHA
+                hybrid_alpha=WEAVIATE_HYBRID_ALPHA,
+                embedding_model=LOCAL_EMBEDDING_MODEL,
+                embedding_device=LOCAL_EMBEDDING_DEVICE,
+                embedding_precision=LOCAL_EMBEDDING_PRECISION,
+                reranker_backend=RERANKER_BACKEND
             )
 
-            stats = self.rag_pipeline.get_stats()
-            if stats['total_chunks'] == 0:
-                self.rag_pipeline.index_documents()
+            # Un seul processus indexe une collection vide : les autres workers
+            # attendent le verrou puis retrouvent les chunks déjà insérés
+            with open(DATA_DIR / ".index.lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    if self.rag_pipeline.get_stats()['total_chunks'] == 0:
+                        self.rag_pipeline.index_documents()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
 
             # Create tools
             self.tools = [
@@ -131,11 +145,7 @@ Thought: {agent_scratchpad}"""
             logger.info("RAG ready")
 
     def _is_conversational(self, question: str) -> bool:
-        q = question.strip().lower()
-        greetings = ['bonjour', 'salut', 'hello', 'hi', 'merci', 'thanks', 'ok', 'super', 'hey']
-
-        # Exact match or with punctuation
-        return q in greetings or any(q == g + p for g in greetings for p in ['!', '.', '?'])
+        return question.strip().lower() in _GREETING_SET
 
     async def ask_async(self, question: str, chat_history: list = None) -> Dict:
         start_time = time.time()
@@ -173,17 +183,20 @@ Thought: {agent_scratchpad}"""
                     history_parts.append(f"{role.capitalize()}: {content}")
                 history_text = "Conversation précédente:\n" + "\n".join(history_parts) + "\n"
 
-            # Run agent with history
-            result = self.agent_executor.invoke({
+            # Run agent with history (blocking LLM/tool calls, kept off the event loop)
+            result = await asyncio.to_thread(self.agent_executor.invoke, {
                 "input": question,
                 "chat_history": history_text
             })
 
             answer = result.get('output', '')
 
-            # Cache result
-            asyncio.create_task(
-                self.cache.set(query=question, answer=answer, system_type="react_agent")
+            # Cache result in the background (reusing the embedding computed by the cache miss)
+            await self.cache.set_in_background(
+                query=question,
+                answer=answer,
+                system_type="react_agent",
+                precomputed_embedding=self.cache.take_query_embedding(question)
             )
 
             return {
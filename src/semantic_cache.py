@@ -4,7 +4,13 @@ Semantic Cache with similarity matching for faster responses
 
 import sqlite3
 import json
+import asyncio
 import time
+import atexit
+import functools
+import threading
+import unicodedata
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -14,16 +20,25 @@ from langchain_openai import OpenAIEmbeddings
 # Register datetime adapter for Python 3.12+ compatibility
 sqlite3.register_adapter(datetime, lambda val: val.isoformat())
 sqlite3.register_converter("timestamp", lambda val: datetime.fromisoformat(val.decode()))
-from src.config import OPENAI_API_KEY
+from src.config import OPENAI_API_KEY, EMBEDDING_MODEL, CACHE_SIMILARITY_THRESHOLD
 from src.utils import logger
 
+# query_embedding BLOB encodings: 1 = raw float32, 2 = int8 with per-vector scale,
+# 3 = int8 of the L2-normalized vector (current; rows load without renormalization)
+EMBEDDING_VERSION_FLOAT32 = 1
+EMBEDDING_VERSION_INT8 = 2
+EMBEDDING_VERSION_INT8_UNIT = 3
+
+# Bumped on every schema change; stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
 
 class SemanticCache:
 
     def __init__(
         self,
         db_path: str = "data/semantic_cache.db",
-        similarity_threshold: float = 0.88,  # OPTIMIZED: Was 0.92, reduced for higher hit rate
+        similarity_threshold: float = CACHE_SIMILARITY_THRESHOLD,
         ttl_hours: int = 24,  # Cache expires after 24 hours
         max_entries: int = 1000
     ):
@@ -34,15 +49,56 @@ class SemanticCache:
         self.ttl_hours = ttl_hours
         self.max_entries = max_entries
 
-        # Embeddings for semantic similarity
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",  # Fast & cheap
-            api_key=OPENAI_API_KEY
+        # Embeddings client, created on first use (see the embeddings property)
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+
+        # Single long-lived connection shared by all operations (guarded by a lock)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,  # autocommit: one implicit transaction per statement
+            check_same_thread=False
         )
+        atexit.register(self.close)
 
         # Initialize database
         self._init_db()
 
+        # In-memory embedding index per system_type (unit-norm rows), loaded lazily and
+        # extended on each get() with rows committed since (by this or another process).
+        # Only replaced under _index_lock, never mutated in place by writers
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._index_lock = threading.Lock()
+
+        # Embeddings computed by get() on a miss, reused by the following set()
+        self._miss_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._max_miss_embeddings = 256
+
+        # Expired rows are filtered on read, so the DELETE only needs to run now and then
+        self._cleanup_interval = 300  # seconds
+        self._last_cleanup_ts = 0.0
+
+        # Access stats of hits, buffered in memory and written in batches
+        # (entry_id -> (last_accessed, access_count increment))
+        self._pending_access_updates: Dict[int, Tuple[datetime, int]] = {}
+        self._pending_access_hits = 0
+        self._access_flush_every = 64  # hits
+        self._access_flush_interval = 5.0  # seconds
+        self._last_access_flush_ts = time.monotonic()
+
+        # Background writes: bounded queue drained in batches by a single writer task
+        # (created on first use, bound to the running event loop)
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._write_queue_size = 256
+        self._write_batch_size = 32
+        self._write_batch_window = 0.05  # seconds
+
+        # LRU eviction runs once every 32 inserts (the table may briefly exceed max_entries)
+        self._insert_count = 0
+        self._enforce_every = 32
+
         # Stats
         self.stats = {
             'hits': 0,
@@ -55,9 +111,28 @@ class SemanticCache:
         logger.info(f"   - TTL: {ttl_hours}h")
         logger.info(f"   - Max entries: {max_entries}")
 
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        # Embeddings for semantic similarity (exact-match hits never need them)
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings(
+                model=EMBEDDING_MODEL,  # Fast & cheap (text-embedding-3-small)
+                api_key=OPENAI_API_KEY
+            )
+        return self._embeddings
+
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
+
+        # WAL lets readers and the writer proceed concurrently; NORMAL sync is safe with WAL
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+
+        # Schema already up to date: skip the DDL and migration checks
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
 
         # Cache table
         cursor.execute("""
@@ -71,68 +146,158 @@ class SemanticCache:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 access_count INTEGER DEFAULT 0,
-                expires_at TIMESTAMP
+                expires_at TIMESTAMP,
+                embedding_scale REAL,
+                embedding_version INTEGER DEFAULT 1,
+                norm_query TEXT
             )
         """)
 
+        # Migrate databases created before embeddings were quantized
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(cache)")}
+        if 'embedding_scale' not in columns:
+            cursor.execute("ALTER TABLE cache ADD COLUMN embedding_scale REAL")
+        if 'embedding_version' not in columns:
+            cursor.execute("ALTER TABLE cache ADD COLUMN embedding_version INTEGER DEFAULT 1")
+        if 'norm_query' not in columns:
+            # Older rows keep NULL here and are only reachable through the semantic path
+            cursor.execute("ALTER TABLE cache ADD COLUMN norm_query TEXT")
+
         # Index for faster lookups
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
         """)
 
-        conn.commit()
-        conn.close()
+        # Exact-match lookups before any embedding call
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_norm_query ON cache(system_type, norm_query)
+        """)
+
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
         logger.info("Cache database initialized")
 
-    def _embedding_to_blob(self, embedding: List[float]) -> bytes:
-        return np.array(embedding, dtype=np.float32).tobytes()
+    def _normalize_query(self, query: str) -> str:
+        return unicodedata.normalize('NFKC', query).strip().lower()
+
+    def _embedding_to_blob(self, embedding: List[float]) -> Tuple[bytes, float]:
+        # Normalized once at write time, so cosine similarity is a plain dot product
+        vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        # Symmetric int8 quantization: 4x smaller than float32, <0.001 cosine error
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        return np.round(vector / scale).astype(np.int8).tobytes(), scale
+
+    def _blob_to_embedding(self, blob: bytes, scale: Optional[float], version: Optional[int]) -> np.ndarray:
+        if version in (EMBEDDING_VERSION_INT8, EMBEDDING_VERSION_INT8_UNIT):
+            vector = np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
+        else:
+            vector = np.frombuffer(blob, dtype=np.float32)
+        # Legacy encodings were stored unnormalized
+        return vector if version == EMBEDDING_VERSION_INT8_UNIT else self._normalize(vector)
+
+    def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
+        # Unit-length rows, so cosine similarity is a plain dot product
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def _refresh_index(self, system_type: str) -> Dict[str, Any]:
+        with self._index_lock:
+            index = self._indexes.get(system_type)
+            if index is not None and len(index['ids']) > self.max_entries + self._enforce_every:
+                index = None  # holds rows evicted by another process: rebuild
+
+            # Row ids only grow (AUTOINCREMENT), so new commits are the rows past max_id
+            after_id = index['max_id'] if index is not None else 0
+            with self._lock:
+                rows = self._conn.execute("""
+                    SELECT id, query, query_embedding, expires_at, embedding_scale, embedding_version
+                    FROM cache
+                    WHERE system_type = ? AND id > ? AND expires_at > ?
+                """, (system_type, after_id, datetime.now())).fetchall()
+
+            if index is not None and not rows:
+                return index
+
+            added = self._index_from_rows(rows)
+            if index is not None:
+                added = {
+                    'ids': index['ids'] + added['ids'],
+                    'queries': index['queries'] + added['queries'],
+                    'expires_at': np.concatenate([index['expires_at'], added['expires_at']]),
+                    'matrix': added['matrix'] if index['matrix'] is None else np.vstack([index['matrix'], added['matrix']]),
+                    'max_id': added['max_id']
+                }
+            added['max_id'] = max(added['max_id'], after_id)
 
-    def _blob_to_embedding(self, blob: bytes) -> np.ndarray:
-        return np.frombuffer(blob, dtype=np.float32)
+            self._indexes[system_type] = added
+            return added
 
-    def _cosine_similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
-        return float(np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2)))
+    def _index_from_rows(self, rows: List[tuple]) -> Dict[str, Any]:
+        # Structure of arrays: one contiguous (N, d) matrix + parallel row data
+        # (answers are read from SQLite on a hit, so the index never serves a stale one)
+        matrix = None
+        if rows:
+            matrix = np.vstack([
+                self._blob_to_embedding(row[2], row[4], row[5]) for row in rows
+            ])
+            self._requantize_legacy_rows(rows)
 
-    def _cleanup_expired(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return {
+            'ids': [row[0] for row in rows],
+            'queries': [row[1] for row in rows],
+            'expires_at': np.array([row[3].timestamp() for row in rows], dtype=np.float64),
+            'matrix': matrix,
+            'max_id': max((row[0] for row in rows), default=0)
+        }
 
-        cursor.execute("""
-            DELETE FROM cache WHERE expires_at < ?
-        """, (datetime.now(),))
+    def _requantize_legacy_rows(self, rows: List[tuple]):
+        # Lazily re-encode rows written before normalized int8 storage
+        updates = []
+        for row in rows:
+            if row[5] != EMBEDDING_VERSION_INT8_UNIT:
+                blob, scale = self._embedding_to_blob(self._blob_to_embedding(row[2], row[4], row[5]))
+                updates.append((blob, scale, EMBEDDING_VERSION_INT8_UNIT, row[0]))
+
+        if updates:
+            with self._lock:
+                self._conn.executemany("""
+                    UPDATE cache
+                    SET query_embedding = ?, embedding_scale = ?, embedding_version = ?
+                    WHERE id = ?
+                """, updates)
+            logger.debug("[Cache] Re-encoded %d legacy embeddings to normalized int8", len(updates))
+
+    def _cleanup_expired(self):
+        with self._lock:
+            cursor = self._conn.execute("""
+                DELETE FROM cache WHERE expires_at < ?
+            """, (datetime.now(),))
 
         deleted = cursor.rowcount
         if deleted > 0:
-            logger.debug(f"[Cache] Cleaned up {deleted} expired entries")
-
-        conn.commit()
-        conn.close()
+            with self._index_lock:
+                self._indexes.clear()
+            logger.debug("[Cache] Cleaned up %d expired entries", deleted)
 
     def _enforce_max_entries(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Count entries
-        cursor.execute("SELECT COUNT(*) FROM cache")
-        count = cursor.fetchone()[0]
+        # LRU order depends on last_accessed: write buffered hits first
+        self._flush_access_updates()
 
-        if count > self.max_entries:
-            # Delete oldest accessed entries
-            to_delete = count - self.max_entries
-            cursor.execute("""
+        # Delete oldest accessed entries beyond max_entries (count and delete in one statement)
+        with self._lock:
+            cursor = self._conn.execute("""
                 DELETE FROM cache WHERE id IN (
                     SELECT id FROM cache
                     ORDER BY last_accessed ASC
-                    LIMIT ?
+                    LIMIT max(0, (SELECT COUNT(*) FROM cache) - ?)
                 )
-            """, (to_delete,))
+            """, (self.max_entries,))
 
+        if cursor.rowcount > 0:
             self.stats['evictions'] += cursor.rowcount
-            logger.debug(f"[Cache] Evicted {cursor.rowcount} LRU entries")
-
-        conn.commit()
-        conn.close()
+            with self._index_lock:
+                self._indexes.clear()
+            logger.debug("[Cache] Evicted %d LRU entries", cursor.rowcount)
 
     async def get(
         self,
@@ -142,63 +307,76 @@ class SemanticCache:
         start = time.time()
 
         # Cleanup expired entries periodically
-        self._cleanup_expired()
+        # SQLite calls are blocking: they run in a worker thread, off the event loop
+        if time.monotonic() - self._last_cleanup_ts > self._cleanup_interval:
+            self._last_cleanup_ts = time.monotonic()
+            await asyncio.to_thread(self._cleanup_expired)
 
-        # Generate query embedding
-        query_embedding = self.embeddings.embed_query(query)
-        query_emb_array = np.array(query_embedding, dtype=np.float32)
+        # Exact (normalized) match first: no embedding round trip needed
+        row = await asyncio.to_thread(self._fetch_exact, system_type, self._normalize_query(query))
 
-        # Fetch all cache entries for this system type
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if row:
+            entry_id, cached_query, answer, metadata, access_count = row
+            await self._record_access(entry_id)
+            self.stats['hits'] += 1
+            elapsed = (time.time() - start) * 1000
 
-        cursor.execute("""
-            SELECT id, query, query_embedding, answer, metadata, access_count
-            FROM cache
-            WHERE system_type = ? AND expires_at > ?
-            ORDER BY last_accessed DESC
-            LIMIT 100
-        """, (system_type, datetime.now()))
-
-        entries = cursor.fetchall()
-
-        if not entries:
-            conn.close()
-            self.stats['misses'] += 1
-            logger.debug(f"[Cache] MISS - No cached entries for {system_type}")
-            return None
-
-        # Find best matching entry
-        best_match = None
-        best_similarity = 0.0
-
-        for entry in entries:
-            entry_id, cached_query, cached_emb_blob, answer, metadata, access_count = entry
-
-            # Calculate similarity
-            cached_emb_array = self._blob_to_embedding(cached_emb_blob)
-            similarity = self._cosine_similarity(query_emb_array, cached_emb_array)
-
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = {
-                    'id': entry_id,
-                    'cached_query': cached_query,
-                    'answer': answer,
-                    'metadata': json.loads(metadata) if metadata else {},
-                    'similarity': similarity,
-                    'access_count': access_count
-                }
+            logger.info(f"[Cache] HIT (exact match, {elapsed:.0f}ms)")
+            logger.info(f"   Query: {query[:50]}...")
+
+            return {
+                'id': entry_id,
+                'cached_query': cached_query,
+                'answer': answer,
+                'metadata': json.loads(metadata) if metadata else {},
+                'similarity': 1.0,
+                'access_count': access_count
+            }
+
+        # Generate query embedding (normalized once for the whole scan)
+        query_embedding = await self.embeddings.aembed_query(query)
+        query_emb_array = self._normalize(np.array(query_embedding, dtype=np.float32))
+
+        # The in-memory index may still hold rows another process has since replaced,
+        # evicted or cleared: a match is confirmed against SQLite, and if its row is gone
+        # the index is rebuilt and scanned once more
+        best_similarity = -1.0
+        for _ in range(2):
+            # All cached entries for this system type, scored with a single GEMV
+            index = await asyncio.to_thread(self._refresh_index, system_type)
+            if not index['ids']:
+                self._remember_miss_embedding(query, query_embedding)
+                self.stats['misses'] += 1
+                logger.debug("[Cache] MISS - No cached entries for %s", system_type)
+                return None
+
+            similarities = index['matrix'] @ query_emb_array
+            similarities[index['expires_at'] <= time.time()] = -1.0  # expired, not yet cleaned up
+
+            best_index = int(similarities.argmax())
+            best_similarity = float(similarities[best_index])
+
+            # Check if best match exceeds threshold
+            if best_similarity < self.similarity_threshold:
+                break
+
+            row = await asyncio.to_thread(self._fetch_by_id, index['ids'][best_index])
+            if row is None:
+                await asyncio.to_thread(self._drop_index, system_type)
+                continue
+
+            answer, metadata, access_count = row
+            best_match = {
+                'id': index['ids'][best_index],
+                'cached_query': index['queries'][best_index],
+                'answer': answer,
+                'metadata': json.loads(metadata) if metadata else {},
+                'similarity': best_similarity,
+                'access_count': access_count
+            }
 
-        # Check if best match exceeds threshold
-        if best_match and best_similarity >= self.similarity_threshold:
             # Update access stats
-            cursor.execute("""
-                UPDATE cache
-                SET last_accessed = ?, access_count = access_count + 1
-                WHERE id = ?
-            """, (datetime.now(), best_match['id']))
-            conn.commit()
+            await self._record_access(best_match['id'])
 
             self.stats['hits'] += 1
             elapsed = (time.time() - start) * 1000
@@ -207,72 +385,218 @@ class SemanticCache:
             logger.info(f"   Query: {query[:50]}...")
             logger.info(f"   Cached: {best_match['cached_query'][:50]}...")
 
-            conn.close()
             return best_match
 
-        conn.close()
+        self._remember_miss_embedding(query, query_embedding)
         self.stats['misses'] += 1
 
-        if best_match:
-            logger.debug(f"[Cache] MISS - Best similarity {best_similarity:.3f} < {self.similarity_threshold}")
+        logger.debug("[Cache] MISS - Best similarity %.3f < %s", best_similarity, self.similarity_threshold)
 
         return None
 
+    def _fetch_exact(self, system_type: str, norm_query: str) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute("""
+                SELECT id, query, answer, metadata, access_count
+                FROM cache
+                WHERE system_type = ? AND norm_query = ? AND expires_at > ?
+            """, (system_type, norm_query, datetime.now())).fetchone()
+
+    def _fetch_by_id(self, entry_id: int) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute("""
+                SELECT answer, metadata, access_count
+                FROM cache
+                WHERE id = ? AND expires_at > ?
+            """, (entry_id, datetime.now())).fetchone()
+
+    def _drop_index(self, system_type: str):
+        with self._index_lock:
+            self._indexes.pop(system_type, None)
+
+    async def _record_access(self, entry_id: int):
+        # Memory-only on the hit path; flushed every 64 hits or 5 s
+        _, count = self._pending_access_updates.get(entry_id, (None, 0))
+        self._pending_access_updates[entry_id] = (datetime.now(), count + 1)
+        self._pending_access_hits += 1
+
+        if (self._pending_access_hits >= self._access_flush_every
+                or time.monotonic() - self._last_access_flush_ts > self._access_flush_interval):
+            await asyncio.to_thread(self._flush_access_updates)
+
+    def _flush_access_updates(self):
+        self._last_access_flush_ts = time.monotonic()
+
+        # Swap the buffer out first: hits recorded meanwhile go to the new one
+        pending, self._pending_access_updates = self._pending_access_updates, {}
+        self._pending_access_hits = 0
+        if not pending:
+            return
+
+        rows = [
+            (last_accessed, count, entry_id)
+            for entry_id, (last_accessed, count) in pending.items()
+        ]
+
+        with self._lock:
+            self._conn.executemany("""
+                UPDATE cache
+                SET last_accessed = ?, access_count = access_count + ?
+                WHERE id = ?
+            """, rows)
+
+    def _remember_miss_embedding(self, query: str, embedding: List[float]):
+        self._miss_embeddings[query] = embedding
+        self._miss_embeddings.move_to_end(query)
+        if len(self._miss_embeddings) > self._max_miss_embeddings:
+            self._miss_embeddings.popitem(last=False)
+
+    def take_query_embedding(self, query: str) -> Optional[List[float]]:
+        """Embedding computed for query by the last missed get(), if still held"""
+        return self._miss_embeddings.pop(query, None)
+
     async def set(
         self,
         query: str,
         answer: str,
         system_type: str = "react_agent",
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        precomputed_embedding: Optional[List[float]] = None
+    ):
+        await self._store([(query, answer, system_type, metadata, precomputed_embedding)])
+
+    async def set_in_background(
+        self,
+        query: str,
+        answer: str,
+        system_type: str = "react_agent",
+        metadata: Optional[Dict] = None,
+        precomputed_embedding: Optional[List[float]] = None
     ):
+        """Queue an entry for the background writer (waits only when the queue is full)"""
+        loop = asyncio.get_running_loop()
+        if self._writer_task is None or self._writer_task.get_loop() is not loop:
+            self._write_queue = asyncio.Queue(maxsize=self._write_queue_size)
+            self._writer_task = loop.create_task(self._writer())
+
+        await self._write_queue.put((query, answer, system_type, metadata, precomputed_embedding))
+
+    async def flush_writes(self):
+        """Wait until every queued entry has been written"""
+        if self._write_queue is not None:
+            await self._write_queue.join()
+
+    async def _writer(self):
+        queue = self._write_queue
+        while True:
+            batch = [await queue.get()]
+
+            # Collect up to a full batch within a short window
+            deadline = time.monotonic() + self._write_batch_window
+            while len(batch) < self._write_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._store(batch)
+            except Exception as e:
+                logger.error(f"[Cache] Failed to store {len(batch)} entries: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _store(self, items: List[tuple]):
         start = time.time()
 
-        # Generate query embedding
-        query_embedding = self.embeddings.embed_query(query)
-        query_emb_blob = self._embedding_to_blob(query_embedding)
+        # Generate query embeddings (skipped when get() already computed them),
+        # one API call for all missing ones
+        missing = [query for query, _, _, _, embedding in items if embedding is None]
+        computed = iter(await self.embeddings.aembed_documents(missing) if missing else [])
 
         # Calculate expiration
         expires_at = datetime.now() + timedelta(hours=self.ttl_hours)
 
-        # Store in DB
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        entries = []
+        for query, answer, system_type, metadata, embedding in items:
+            query_emb_blob, query_emb_scale = self._embedding_to_blob(
+                next(computed) if embedding is None else embedding
+            )
+            metadata_json = json.dumps(metadata) if metadata else None
+            entries.append((query, query_emb_blob, query_emb_scale, answer,
+                            metadata_json, system_type, expires_at))
+
+        # New rows reach the in-memory index through the next get()
+        await asyncio.to_thread(self._insert_entries, entries)
 
-        cursor.execute("""
-            INSERT INTO cache (query, query_embedding, answer, metadata, system_type, expires_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            query,
-            query_emb_blob,
-            answer,
-            json.dumps(metadata) if metadata else None,
-            system_type,
-            expires_at
-        ))
-
-        conn.commit()
-        conn.close()
-
-        # Enforce max entries
-        self._enforce_max_entries()
+        # Enforce max entries, amortized over inserts
+        previous_count = self._insert_count
+        self._insert_count += len(entries)
+        if self._insert_count // self._enforce_every != previous_count // self._enforce_every:
+            await asyncio.to_thread(self._enforce_max_entries)
 
         elapsed = (time.time() - start) * 1000
-        logger.debug(f"[Cache] Stored entry ({elapsed:.0f}ms, expires in {self.ttl_hours}h)")
+        logger.debug("[Cache] Stored %d entries (%.0fms, expires in %dh)", len(entries), elapsed, self.ttl_hours)
+
+    def _insert_entries(self, entries: List[tuple]):
+        # Store in DB in a single transaction (an entry with the same normalized query is replaced).
+        # Rows are inserted one by one rather than with executemany to know which ones replaced a row.
+        replaced = set()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for (query, query_emb_blob, query_emb_scale, answer,
+                     metadata_json, system_type, expires_at) in entries:
+                    norm_query = self._normalize_query(query)
+
+                    if self._conn.execute("""
+                        SELECT 1 FROM cache WHERE system_type = ? AND norm_query = ?
+                    """, (system_type, norm_query)).fetchone() is not None:
+                        replaced.add(system_type)
+
+                    self._conn.execute("""
+                        INSERT OR REPLACE INTO cache (query, query_embedding, answer, metadata, system_type,
+                                                      expires_at, embedding_scale, embedding_version, norm_query)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        query,
+                        query_emb_blob,
+                        answer,
+                        metadata_json,
+                        system_type,
+                        expires_at,
+                        query_emb_scale,
+                        EMBEDDING_VERSION_INT8_UNIT,
+                        norm_query
+                    ))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        # A replaced row is gone from SQLite but not from the index: rebuild it on next get()
+        if replaced:
+            with self._index_lock:
+                for system_type in replaced:
+                    self._indexes.pop(system_type, None)
 
     def get_stats(self) -> Dict:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._flush_access_updates()
 
         # Count entries
-        cursor.execute("SELECT COUNT(*) FROM cache WHERE expires_at > ?", (datetime.now(),))
-        active_entries = cursor.fetchone()[0]
+        with self._lock:
+            active_entries = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE expires_at > ?", (datetime.now(),)
+            ).fetchone()[0]
 
         # Calculate hit rate
         total = self.stats['hits'] + self.stats['misses']
         hit_rate = (self.stats['hits'] / total * 100) if total > 0 else 0
 
-        conn.close()
-
         return {
             'hits': self.stats['hits'],
             'misses': self.stats['misses'],
@@ -283,26 +607,31 @@ class SemanticCache:
         }
 
     def clear(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._pending_access_updates = {}
+        self._pending_access_hits = 0
 
-        cursor.execute("DELETE FROM cache")
-        deleted = cursor.rowcount
-
-        conn.commit()
-        conn.close()
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM cache").rowcount
+        with self._index_lock:
+            self._indexes.clear()
 
         logger.info(f"[Cache] Cleared {deleted} entries")
 
         # Reset stats
         self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
 
+    def close(self):
+        # Buffered hits only update LRU stats, but write them if the connection is still open
+        try:
+            self._flush_access_updates()
+        except sqlite3.ProgrammingError:
+            pass  # already closed
+
+        with self._lock:
+            self._conn.close()
 
-# Global cache instance
-_cache_instance = None
 
+# Global cache instance (created once per process)
+@functools.cache
 def get_cache() -> SemanticCache:
-    global _cache_instance
-    if _cache_instance is None:
-        _cache_instance = SemanticCache()
-    return _cache_instance
+    return SemanticCache()
@@ -1,6 +1,11 @@
 """Logging and utility functions"""
+import atexit
+import functools
 import logging
+import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 from src.config import LOG_FILE, LOG_LEVEL
@@ -28,24 +33,45 @@ class RAGLogger:
         # File handler
         file_handler = logging.FileHandler(self.log_file, mode='a', encoding='utf-8')
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
 
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
 
-    def info(self, message: str):
-        self.logger.info(message)
+        # Les écritures (fichier + console) se font dans un thread dédié :
+        # l'appelant ne fait que déposer l'enregistrement dans une file
+        self._handlers = (file_handler, console_handler)
+        log_queue = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(log_queue)
+        self.logger.addHandler(self._queue_handler)
 
-    def error(self, message: str):
-        self.logger.error(message)
+        self._listener = QueueListener(log_queue, *self._handlers, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self._listener.stop)  # vide la file avant la sortie
 
-    def warning(self, message: str):
-        self.logger.warning(message)
+        # Un processus forké n'hérite pas du thread d'écriture : écrire directement
+        os.register_at_fork(after_in_child=self._use_direct_handlers)
 
-    def debug(self, message: str):
-        self.logger.debug(message)
+    def _use_direct_handlers(self):
+        self.logger.removeHandler(self._queue_handler)
+        for handler in self._handlers:
+            self.logger.addHandler(handler)
+
+    # Extra args are %-formatted lazily, only if the record is actually emitted
+    def info(self, message: str, *args):
+        self.logger.info(message, *args)
+
+    def error(self, message: str, *args):
+        self.logger.error(message, *args)
+
+    def warning(self, message: str, *args):
+        self.logger.warning(message, *args)
+
+    def debug(self, message: str, *args):
+        self.logger.debug(message, *args)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
 
     def section(self, title: str):
         separator = "=" * 80
@@ -60,11 +86,16 @@ class RAGLogger:
         self.logger.info(f"{separator}\n")
 
 
+@functools.lru_cache(maxsize=8)
+def _get_encoder(model: str):
+    # Table BPE chargée une seule fois par modèle et par processus
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
+
+
 def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
     try:
-        import tiktoken
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
+        return len(_get_encoder(model).encode(text))
     except Exception as e:
         # Fallback: approximation basique (1 token ≈ 4 caractères)
         return len(text) // 4
@@ -84,14 +115,8 @@ def format_sources(sources: list) -> str:
 
 
 def clean_text(text: str) -> str:
-    # Supprimer les espaces multiples
-    text = " ".join(text.split())
-
-    # Supprimer les retours à la ligne multiples
-    while "\n\n\n" in text:
-        text = text.replace("\n\n\n", "\n\n")
-
-    return text.strip()
+    # Supprimer les espaces multiples (retours à la ligne compris) en une seule passe
+    return " ".join(text.split())
 
 
 # Créer une instance globale du logger
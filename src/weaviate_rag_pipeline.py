@@ -1,10 +1,20 @@
 """Weaviate RAG Pipeline with Hybrid Search and Reranking"""
 
+import atexit
+import hashlib
+import inspect
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
-from weaviate.classes.query import MetadataQuery
-from typing import List, Dict, Optional
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter, MetadataQuery
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from pathlib import Path
+from urllib.parse import urlparse
+from uuid import UUID
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 try:
@@ -12,23 +22,100 @@ try:
 except ImportError:
     from langchain_community.embeddings import HuggingFaceEmbeddings
 from sentence_transformers import CrossEncoder
+import numpy as np
+import torch
 
 from src.config import validate_config
 from src.document_loader import MultiFormatDocumentLoader
 from src.utils import logger
 
 
+def _length_order(texts: List[str]) -> List[int]:
+    """Indices of texts sorted by length, so each cross-encoder mini-batch pads to similar lengths"""
+    return sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+
+# Models loaded once per process and shared by every pipeline instance
+_MODELS: Dict[tuple, Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _shared_model(key: tuple, load: Callable[[], Any]) -> Any:
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            _MODELS[key] = load()
+        return _MODELS[key]
+
+
+_EMBEDDING_PRECISIONS = ("fp32", "fp16", "int8")
+
+
+def _load_embeddings(model_name: str, device: str, precision: str) -> HuggingFaceEmbeddings:
+    if precision not in _EMBEDDING_PRECISIONS:
+        raise ValueError(
+            f"LOCAL_EMBEDDING_PRECISION must be one of {', '.join(_EMBEDDING_PRECISIONS)}, got {precision!r}"
+        )
+    if precision == "int8" and device != "cpu":
+        raise ValueError(f"LOCAL_EMBEDDING_PRECISION=int8 requires LOCAL_EMBEDDING_DEVICE=cpu, got {device!r}")
+
+    logger.info(f" Loading {model_name} embeddings ({precision})...")
+    model_kwargs = {'device': device}
+    if precision == "fp16":
+        model_kwargs['model_kwargs'] = {'torch_dtype': torch.float16}
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': 64}
+    )
+    if precision == "int8":
+        # Dynamic int8 quantization of the Linear layers (CPU): weights read 4x smaller
+        # langchain_huggingface names the SentenceTransformer _client, langchain_community client
+        client = getattr(embeddings, "_client", None) or embeddings.client
+        transformer = client[0]
+        transformer.auto_model = torch.quantization.quantize_dynamic(
+            transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return embeddings
+
+
+# Int8 ONNX export (AVX-512 VNNI dynamic quantization) published with the reranker model
+_RERANKER_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+def _load_cross_encoder(model_name: str, backend: str) -> CrossEncoder:
+    logger.info(f" Loading Cross-Encoder ({backend})...")
+    if backend == "onnx":
+        try:
+            return CrossEncoder(
+                model_name,
+                backend="onnx",
+                model_kwargs={'file_name': _RERANKER_ONNX_FILE, 'provider': 'CPUExecutionProvider'}
+            )
+        except Exception as e:
+            logger.warning(f" ONNX reranker unavailable ({e}), falling back to torch")
+    return CrossEncoder(model_name)
+
+
 class WeaviateRAGPipeline:
     COLLECTION_NAME = "GivaudanDocument"
 
+    # Schema properties returned as metadata (everything except "content")
+    _META_KEYS = ('filename', 'format', 'chunk_index', 'page_number')
+
     def __init__(
         self,
         weaviate_url: str = "http://localhost:8090",
+        grpc_port: int = 50051,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
         top_k_retrieve: int = 5,  # Get 5 candidates from hybrid search
         top_k_final: int = 3,
-        hybrid_alpha: float = 0.7  # 70% dense vectors, 30% BM25
+        hybrid_alpha: float = 0.7,  # 70% dense vectors, 30% BM25
+        embedding_model: str = "BAAI/bge-large-en-v1.5",
+        embedding_device: str = "cpu",
+        embedding_precision: str = "fp32",  # fp32, fp16 (GPU) or int8 (CPU)
+        reranker_backend: str = "torch",  # torch or onnx (int8 ONNX Runtime)
+        embedding_cache_path: str = "data/embedding_cache.db"
     ):
         validate_config()
 
@@ -36,23 +123,48 @@ class WeaviateRAGPipeline:
 
         # Configuration
         self.weaviate_url = weaviate_url
+        self.grpc_port = grpc_port
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.top_k_retrieve = top_k_retrieve
         self.top_k_final = top_k_final
         self.hybrid_alpha = hybrid_alpha  # 0 = pure BM25, 1 = pure vector
 
-        # Embeddings - BGE-large
-        logger.info(" Loading BGE-large embeddings...")
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="BAAI/bge-large-en-v1.5",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
+        # Embeddings - BGE (large by default), shared across instances
+        self.embedding_model = embedding_model
+        self.embeddings = _shared_model(
+            ('embeddings', embedding_model, embedding_device, embedding_precision),
+            lambda: _load_embeddings(embedding_model, embedding_device, embedding_precision)
+        )
+
+        # Persistent chunk embedding cache: re-indexing unchanged documents skips the model
+        # (keyed by model + precision + text hash, vectors stored as float16)
+        self._embedding_cache_key = f"{embedding_model}:{embedding_precision}"
+        Path(embedding_cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self._embedding_cache = sqlite3.connect(embedding_cache_path, check_same_thread=False)
+        self._embedding_cache.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        """)
+
+        # Cross-Encoder for reranking, shared across instances
+        reranker_model = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+        self.cross_encoder = _shared_model(
+            ('cross_encoder', reranker_model, reranker_backend),
+            lambda: _load_cross_encoder(reranker_model, reranker_backend)
         )
 
-        # Cross-Encoder for reranking
-        logger.info(" Loading Cross-Encoder...")
-        self.cross_encoder = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+        # LRU caches for repeated queries: query -> embedding, (query, object uuid) -> rerank score
+        # (re-indexing creates new uuids, so stale scores are never reused)
+        self._lru_lock = threading.Lock()
+        self._query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._max_query_embeddings = 4096
+        self._rerank_scores: "OrderedDict[Tuple[str, UUID], float]" = OrderedDict()
+        self._max_rerank_scores = 10_000
 
         # Text splitter
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -70,18 +182,29 @@ class WeaviateRAGPipeline:
         self._connect_weaviate()
 
         logger.info(" Weaviate RAG Pipeline initialized")
-        logger.info(f" - Weaviate URL: {weaviate_url}")
-        logger.info(f" - Embeddings: BGE-large-en-v1.5")
+        logger.info(f" - Weaviate URL: {weaviate_url} (gRPC port {grpc_port})")
+        logger.info(f" - Embeddings: {embedding_model} ({embedding_precision})")
         logger.info(f" - Hybrid alpha: {hybrid_alpha:.0%} dense")
-        logger.info(f" - Reranker: CrossEncoder ms-marco-MiniLM")
+        logger.info(f" - Reranker: CrossEncoder ms-marco-MiniLM ({reranker_backend})")
 
     def _connect_weaviate(self):
         try:
             logger.info(f" Connecting to Weaviate at {self.weaviate_url}...")
 
-            self.client = weaviate.connect_to_local(
-                host=self.weaviate_url.replace("http://", "").split(":")[0],
-                port=int(self.weaviate_url.split(":")[-1])
+            # Parsed once; .port raises ValueError on a non-numeric port
+            url = urlparse(self.weaviate_url)
+            if url.scheme not in ("http", "https") or not url.hostname:
+                raise ValueError(f"Invalid WEAVIATE_URL (expected http(s)://host[:port]): {self.weaviate_url!r}")
+            secure = url.scheme == "https"
+            port = url.port or (443 if secure else 8090)
+
+            self.client = weaviate.connect_to_custom(
+                http_host=url.hostname,
+                http_port=port,
+                http_secure=secure,
+                grpc_host=url.hostname,
+                grpc_port=self.grpc_port,  # protobuf over gRPC for queries and batch imports
+                grpc_secure=secure
             )
 
             # Check if connected
@@ -145,16 +268,112 @@ class WeaviateRAGPipeline:
         logger.info(f" - Properties: 5 metadata fields")
         logger.info(f" - Hybrid search: enabled (BM25 + Dense)")
 
-    def _extract_metadata(self, doc: Document, chunk_index: int, total_chunks: int) -> Dict:
-        """Extract metadata from document"""
-        metadata = {
-            "content": doc.page_content,
-            "filename": doc.metadata.get('filename', 'unknown'),
-            "format": doc.metadata.get('format', 'unknown'),
-            "chunk_index": chunk_index,
-            "page_number": doc.metadata.get('page_number', 0),
-        }
-        return metadata
+    def _lru_get(self, cache: OrderedDict, key):
+        with self._lru_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _lru_put(self, cache: OrderedDict, key, value, max_size: int):
+        with self._lru_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            if len(cache) > max_size:
+                cache.popitem(last=False)
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, reading unchanged ones from the persistent cache"""
+        hashes = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+
+        positions: Dict[bytes, List[int]] = {}
+        for i, text_hash in enumerate(hashes):
+            positions.setdefault(text_hash, []).append(i)
+
+        if positions:
+            rows = self._embedding_cache.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN "
+                f"({','.join('?' * len(positions))})",
+                [self._embedding_cache_key, *positions]
+            )
+            for text_hash, vector in rows:
+                cached = np.frombuffer(vector, dtype=np.float16).astype(np.float32).tolist()
+                for i in positions[text_hash]:
+                    embeddings[i] = cached
+
+        # One model input per distinct uncached text
+        missing = [indices[0] for indices in positions.values() if embeddings[indices[0]] is None]
+        if missing:
+            # SentenceTransformer.encode already length-sorts its input into mini-batches
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                for position in positions[hashes[i]]:
+                    embeddings[position] = embedding
+
+            with self._embedding_cache:
+                self._embedding_cache.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                    [
+                        (self._embedding_cache_key, hashes[i],
+                         np.asarray(embeddings[i], dtype=np.float16).tobytes())
+                        for i in missing
+                    ]
+                )
+
+        logger.debug(" → %d/%d chunks embedded, others from cache", len(missing), len(texts))
+        return embeddings
+
+    def _embed_query(self, query: str) -> List[float]:
+        # Repeated queries skip the embedding model forward pass
+        embedding = self._lru_get(self._query_embeddings, query)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(query)
+            self._lru_put(self._query_embeddings, query, embedding, self._max_query_embeddings)
+        return embedding
+
+    def _fetch_contents(self, results: List[Dict]):
+        """Fill in 'content' for results returned without it (one fetch for all)"""
+        uuids = [result['uuid'] for result in results if result['content'] is None]
+        if not uuids:
+            return
+
+        response = self.collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any(uuids),
+            limit=len(uuids),
+            return_properties=['content']
+        )
+        contents = {obj.uuid: obj.properties['content'] for obj in response.objects}
+        for result in results:
+            if result['content'] is None:
+                result['content'] = contents.get(result['uuid'])  # None if deleted meanwhile
+
+    def _rerank_scores_for(self, query: str, results: List[Dict]) -> List[float]:
+        # Cached (query, object) scores are reused; only new pairs need content and the cross-encoder
+        keys = [(query, result['uuid']) for result in results]
+        scores = [self._lru_get(self._rerank_scores, key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        self._fetch_contents([results[i] for i in missing])
+        for i in missing:
+            if results[i]['content'] is None:
+                scores[i] = float('-inf')
+        missing = [i for i in missing if scores[i] is None]
+
+        if missing:
+            # Length-sorted, then scores mapped back to pair order
+            order = _length_order([results[i]['content'] for i in missing])
+            sorted_scores = self.cross_encoder.predict(
+                [[query, results[missing[i]]['content']] for i in order],
+                batch_size=min(len(missing), 32),
+                show_progress_bar=False
+            )
+            for j, i in enumerate(order):
+                score = float(sorted_scores[j])
+                scores[missing[i]] = score
+                self._lru_put(self._rerank_scores, keys[missing[i]], score, self._max_rerank_scores)
+
+        return scores
 
     def index_documents(self, data_dir: str = "data/raw"):
         """Load and index documents into Weaviate"""
@@ -176,51 +395,93 @@ class WeaviateRAGPipeline:
         # Generate embeddings and index
         logger.info(f" Generating embeddings and indexing to Weaviate...")
 
-        indexed_count = 0
-        batch_size = 10
+        embedded_count = 0
+        embed_slice_size = 256  # chunks embedded per embed_documents call (bounds memory)
+        insert_batch_size = 100
+
+        # Inserts run in worker threads while the next slice is being embedded;
+        # the semaphore caps in-flight batches to respect Weaviate rate limits
+        in_flight = threading.BoundedSemaphore(5)
+        futures = []
 
-        with self.collection.batch.dynamic() as batch:
-            for i, chunk in enumerate(chunks):
-                # Generate embedding
-                embedding = self.embeddings.embed_query(chunk.page_content)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for start in range(0, len(chunks), embed_slice_size):
+                chunk_slice = chunks[start:start + embed_slice_size]
+
+                # Generate embeddings for the whole slice (mini-batches of 64 in the model,
+                # unchanged chunks read from the embedding cache)
+                embeddings = self._embed_documents([chunk.page_content for chunk in chunk_slice])
 
                 # Extract rich metadata
-                metadata = self._extract_metadata(chunk, i, len(chunks))
+                objects = [
+                    DataObject(
+                        properties={
+                            "content": chunk.page_content,
+                            "filename": m.get('filename', 'unknown'),
+                            "format": m.get('format', 'unknown'),
+                            "chunk_index": i,
+                            "page_number": m.get('page_number', 0),
+                        },
+                        vector=embedding
+                    )
+                    for i, (chunk, embedding) in enumerate(zip(chunk_slice, embeddings), start)
+                    for m in (chunk.metadata,)
+                ]
 
                 # Add to Weaviate
-                batch.add_object(
-                    properties=metadata,
-                    vector=embedding
-                )
+                for batch_start in range(0, len(objects), insert_batch_size):
+                    in_flight.acquire()
+                    future = executor.submit(
+                        self._insert_batch, objects[batch_start:batch_start + insert_batch_size]
+                    )
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append(future)
 
-                indexed_count += 1
+                embedded_count += len(objects)
+                logger.info(f" → Embedded {embedded_count}/{len(chunks)} chunks...")
 
-                if (i + 1) % batch_size == 0:
-                    logger.info(f" → Indexed {i + 1}/{len(chunks)} chunks...")
+        indexed_count = sum(future.result() for future in futures)
 
         logger.info(f" Successfully indexed {indexed_count} chunks to Weaviate!")
         logger.info(f" - Collection: {self.COLLECTION_NAME}")
-        logger.info(f" - Vector dimensions: 1024 (BGE-large)")
+        logger.info(f" - Vector dimensions: {len(embeddings[0]) if chunks else 0} ({self.embedding_model})")
         logger.info(f" - Metadata fields: 5")
 
-    def hybrid_search(self, query: str, k: int = None) -> List[Dict]:
+    def _insert_batch(self, objects: List[DataObject]) -> int:
+        """Insert one batch of objects, returning how many were stored"""
+        response = self.collection.data.insert_many(objects)
+        if response.has_errors:
+            logger.error(f" {len(response.errors)} objects failed to index: "
+                         f"{next(iter(response.errors.values()))}")
+        return len(objects) - len(response.errors)
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = None,
+        query_vector: Optional[List[float]] = None,
+        include_content: bool = True
+    ) -> List[Dict]:
         """
         Hybrid search (BM25 + Dense vectors)
 
         Args:
             query: Search query
             k: Number of results (default: top_k_retrieve)
+            query_vector: Precomputed query embedding (computed if None)
+            include_content: Return chunk text (False: metadata only, content is None)
 
         Returns:
-            List of results with content and metadata
+            List of results with uuid, content and metadata
         """
         if k is None:
             k = self.top_k_retrieve
 
-        logger.debug(f"[Weaviate Search] Query: {query}, K: {k}")
+        logger.debug("[Weaviate Search] Query: %s, K: %d", query, k)
 
-        # Generate query embedding
-        query_vector = self.embeddings.embed_query(query)
+        # Generate query embedding (cached per query string)
+        if query_vector is None:
+            query_vector = self._embed_query(query)
 
         # Hybrid search (BM25 + Dense)
         response = self.collection.query.hybrid(
@@ -228,18 +489,22 @@ class WeaviateRAGPipeline:
             vector=query_vector,
             alpha=self.hybrid_alpha,  # 0.7 = 70% dense, 30% BM25
             limit=k,
+            return_properties=None if include_content else list(self._META_KEYS),
             return_metadata=MetadataQuery(score=True)
         )
 
-        results = []
-        for obj in response.objects:
-            results.append({
-                'content': obj.properties['content'],
-                'metadata': {k: v for k, v in obj.properties.items() if k != 'content'},
+        results = [
+            {
+                'uuid': obj.uuid,
+                'content': props.get('content'),
+                'metadata': {key: props[key] for key in self._META_KEYS if key in props},
                 'score': obj.metadata.score if obj.metadata else 0.0
-            })
+            }
+            for obj in response.objects
+            for props in (obj.properties,)
+        ]
 
-        logger.debug(f" → Retrieved {len(results)} results")
+        logger.debug(" → Retrieved %d results", len(results))
         return results
 
     def retrieve_and_rerank(
@@ -262,56 +527,63 @@ class WeaviateRAGPipeline:
         if k is None:
             k = self.top_k_final
 
-        logger.debug(f"[Weaviate Retrieve+Rerank] Query: {query} (fast_mode={fast_mode})")
+        logger.debug("[Weaviate Retrieve+Rerank] Query: %s (fast_mode=%s)", query, fast_mode)
+
+        # Query embedded once here and passed down
+        query_vector = self._embed_query(query)
 
         # Step 1: Hybrid search → Top results
+        # (reranking fetches text only for candidates without a cached score, and for the winners)
         retrieve_k = k if fast_mode else self.top_k_retrieve
-        results = self.hybrid_search(query, k=retrieve_k)
+        results = self.hybrid_search(query, k=retrieve_k, query_vector=query_vector, include_content=fast_mode)
 
         if not results:
             logger.warning("No results from hybrid search")
             return []
 
-        logger.debug(f" Step 1: Hybrid search → {len(results)} results")
+        logger.debug(" Step 1: Hybrid search → %d results", len(results))
 
         # FAST MODE: Skip cross-encoder reranking (saves 2-5 seconds!)
         if fast_mode:
-            logger.debug(f" [FAST MODE] Skipping cross-encoder reranking")
+            logger.debug(" [FAST MODE] Skipping cross-encoder reranking")
             docs = []
             for i, result in enumerate(results[:k], 1):
-                doc = Document(
-                    page_content=result['content'],
-                    metadata={**result['metadata'], 'hybrid_score': result['score']}
-                )
+                # result['metadata'] is a fresh dict from hybrid_search: annotate it in place
+                metadata = result['metadata']
+                metadata['hybrid_score'] = result['score']
+                doc = Document(page_content=result['content'], metadata=metadata)
                 docs.append(doc)
-                logger.debug(f" {i}. {result['metadata']['filename']} (hybrid score: {result['score']:.3f})")
+                logger.debug(" %d. %s (hybrid score: %.3f)", i, metadata['filename'], result['score'])
 
             logger.info(f" Retrieved {len(docs)} documents (hybrid only - FAST)")
             return docs
 
         # STANDARD MODE: Cross-encoder reranking for maximum precision
-        logger.debug(f" Step 2: Cross-encoder reranking → top {k}")
+        logger.debug(" Step 2: Cross-encoder reranking → top %d", k)
 
-        # Prepare pairs
-        pairs = [[query, result['content']] for result in results]
+        # Score with cross-encoder (cached scores reused)
+        scores = self._rerank_scores_for(query, results)
 
-        # Score with cross-encoder
-        scores = self.cross_encoder.predict(pairs)
+        # Sort by score (stable, so ties keep hybrid search order)
+        scores = np.asarray(scores, dtype=np.float32)
+        order = [index for index in np.argsort(-scores, kind='stable')[:k] if np.isfinite(scores[index])]
 
-        # Sort by score
-        result_score_pairs = list(zip(results, scores))
-        result_score_pairs.sort(key=lambda x: x[1], reverse=True)
+        # Stage 2: text of the winners that were scored from cache
+        self._fetch_contents([results[index] for index in order])
 
         # Convert to Document objects
         reranked_docs = []
-        for i, (result, score) in enumerate(result_score_pairs[:k], 1):
-            doc = Document(
-                page_content=result['content'],
-                metadata={**result['metadata'], 'rerank_score': float(score)}
-            )
+        for i, index in enumerate(order, 1):
+            result = results[index]
+            if result['content'] is None:
+                continue  # deleted since the search
+            score = float(scores[index])
+            metadata = result['metadata']
+            metadata['rerank_score'] = score
+            doc = Document(page_content=result['content'], metadata=metadata)
             reranked_docs.append(doc)
 
-            logger.debug(f" {i}. {result['metadata']['filename']} (score: {score:.3f})")
+            logger.debug(" %d. %s (score: %.3f)", i, metadata['filename'], score)
 
         logger.info(f" Retrieved {len(reranked_docs)} documents (hybrid + reranked)")
         return reranked_docs
@@ -337,3 +609,35 @@ class WeaviateRAGPipeline:
         if self.client:
             self.client.close()
             logger.info(" Weaviate connection closed")
+        self._embedding_cache.close()
+
+
+# Shared pipeline instance (created once per process, on first use)
+_PIPELINE: Optional[WeaviateRAGPipeline] = None
+_PIPELINE_ARGS: Dict[str, Any] = {}
+_PIPELINE_LOCK = threading.Lock()
+
+
+def _pipeline_args(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # Explicit kwargs completed with the constructor defaults, so equal configurations compare equal
+    bound = inspect.signature(WeaviateRAGPipeline.__init__).bind(None, **kwargs)
+    bound.apply_defaults()
+    return {name: value for name, value in bound.arguments.items() if name != 'self'}
+
+
+def get_pipeline(**kwargs) -> WeaviateRAGPipeline:
+    """Process-wide pipeline; later calls must pass the same configuration as the first one"""
+    global _PIPELINE, _PIPELINE_ARGS
+    args = _pipeline_args(kwargs)
+    with _PIPELINE_LOCK:
+        if _PIPELINE is None:
+            _PIPELINE = WeaviateRAGPipeline(**kwargs)
+            _PIPELINE_ARGS = args
+            atexit.register(_PIPELINE.close)
+        elif args != _PIPELINE_ARGS:
+            differing = ", ".join(
+                f"{name}={value!r} (pipeline: {_PIPELINE_ARGS[name]!r})"
+                for name, value in args.items() if value != _PIPELINE_ARGS[name]
+            )
+            raise ValueError(f"Pipeline already created with a different configuration: {differing}")
+        return _PIPELINE
@@ -1,15 +1,28 @@
 """Web Search Agent using SerpAPI"""
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 from src.config import SERPAPI_API_KEY, validate_config
 from src.utils import logger
 
 
 class WebSearchAgent:
 
+    # Givaudan context added to every query
+    _PREFIX = "Givaudan parfums arômes "
+
     def __init__(self):
         validate_config()
         self.serpapi_available = bool(SERPAPI_API_KEY)
 
+        # Résultats récents par requête enrichie (TTL); l'agent appelle l'outil
+        # depuis plusieurs threads, d'où le verrou
+        self._results: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        self._max_results = 512
+        self._results_ttl = 3600  # seconds
+
         if self.serpapi_available:
             try:
                 from langchain_community.utilities import SerpAPIWrapper
@@ -23,14 +36,34 @@ class WebSearchAgent:
             logger.warning("SERPAPI_API_KEY non configurée - recherche web désactivée")
             self.search = None
 
+    def _cached_result(self, enriched_query: str) -> Optional[str]:
+        with self._results_lock:
+            entry = self._results.get(enriched_query)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at <= time.monotonic():
+                self._results.pop(enriched_query, None)
+                return None
+            return results
+
+    def _remember_result(self, enriched_query: str, results: str):
+        with self._results_lock:
+            self._results[enriched_query] = (time.monotonic() + self._results_ttl, results)
+            self._results.move_to_end(enriched_query)
+            if len(self._results) > self._max_results:
+                self._results.popitem(last=False)
+
     def search_web(self, query: str) -> Optional[str]:
         if not self.serpapi_available or not self.search:
             return "Recherche web non disponible (SerpAPI non configurée)"
 
         try:
-            # Add Givaudan context
-            enriched_query = f"Givaudan parfums arômes {query}"
-            results = self.search.run(enriched_query)
+            enriched_query = self._PREFIX + query
+            results = self._cached_result(enriched_query)
+            if results is None:
+                results = self.search.run(enriched_query)
+                self._remember_result(enriched_query, results)
             logger.info(f" Web search results obtained for: {query}")
             return results
         except Exception as e: